@@ -17,7 +17,7 @@ charmcraft fetch-lib charms.sdcore_nrf.v0.fiveg_nrf
 ```
 
 Add the following libraries to the charm's `requirements.txt` file:
-- pydantic
+- pydantic>=2
 
 ### Requirer charm
 The requirer charm is the one requiring the NRF information.
@@ -94,13 +94,13 @@ if __name__ == "__main__":
 """
 
 import logging
-from typing import Optional
+from typing import Mapping, Optional
 
 from interface_tester.schema_base import DataBagSchema  # type: ignore[import]
 from ops.charm import CharmBase, CharmEvents, RelationChangedEvent
 from ops.framework import EventBase, EventSource, Handle, Object
 from ops.model import Relation
-from pydantic import AnyHttpUrl, BaseModel, Field, ValidationError
+from pydantic import AnyHttpUrl, BaseModel, Field, TypeAdapter, ValidationError
 
 # The unique Charmhub library identifier, never change it
 LIBID = "cd132a12c2b34243bfd2bae8d08c32d6"
@@ -110,9 +110,9 @@ LIBAPI = 0
 
 # Increment this PATCH version before using `charmcraft publish-lib` or reset
 # to 0 if you are raising the major API version
-LIBPATCH = 5
+LIBPATCH = 6
 
-PYDEPS = ["pydantic", "pytest-interface-tester"]
+PYDEPS = ["pydantic>=2", "pytest-interface-tester"]
 
 
 logger = logging.getLogger(__name__)
@@ -145,23 +145,38 @@ class ProviderSchema(DataBagSchema):
     app: ProviderAppData
 
 
-def data_matches_provider_schema(data: dict) -> bool:
-    """Returns whether data matches provider schema.
+_URL_ADAPTER = TypeAdapter(AnyHttpUrl)
+
+
+def _url_is_valid(url: str) -> bool:
+    """Returns whether the given url is a valid HTTP(S) url.
 
     Args:
-        data (dict): Data to be validated.
+        url (str): Url to be validated.
 
     Returns:
-        bool: True if data matches provider schema, False otherwise.
+        bool: True if the url is valid, False otherwise.
     """
     try:
-        ProviderSchema(app=data)
+        _URL_ADAPTER.validate_python(url)
         return True
     except ValidationError as e:
-        logger.debug("Invalid data: %s", e)
+        logger.debug("Invalid url: %s", e)
         return False
 
 
+def data_matches_provider_schema(data: Mapping[str, str]) -> bool:
+    """Returns whether data matches provider schema.
+
+    Args:
+        data (Mapping): Data to be validated.
+
+    Returns:
+        bool: True if data matches provider schema, False otherwise.
+    """
+    return _url_is_valid(data.get("url", ""))
+
+
 class NRFAvailableEvent(EventBase):
     """Charm event emitted when a NRF is available. It carries the NRF url."""
 
@@ -220,24 +235,26 @@ class NRFRequires(Object):
             return remote_app_relation_data.get("url")
         return None
 
-    def _get_remote_app_relation_data(self, relation: Optional[Relation] = None) -> Optional[dict]:
+    def _get_remote_app_relation_data(
+        self, relation: Optional[Relation] = None
+    ) -> Optional[Mapping[str, str]]:
         """Get relation data for the remote application.
 
         Args:
             Relation: Juju relation object (optional).
 
         Returns:
-            dict: Relation data for the remote application.
+            Mapping: Relation data for the remote application.
             or None if the relation data is invalid.
         """
         relation = relation or self.model.get_relation(self.relation_name)
         if not relation:
-            logger.warning(f"No relation: {self.relation_name}")
+            logger.warning("No relation: %s", self.relation_name)
             return None
         if not relation.app:
             logger.warning("No remote application in relation: %s", self.relation_name)
             return None
-        remote_app_relation_data = dict(relation.data[relation.app])
+        remote_app_relation_data = relation.data[relation.app]
         if not data_matches_provider_schema(remote_app_relation_data):
             logger.debug("Invalid relation data: %s", remote_app_relation_data)
             return None
@@ -253,6 +270,21 @@ class NRFProvides(Object):
         self.relation_name = relation_name
         self.charm = charm
 
+    def _validate_nrf_information(self, url: str) -> None:
+        """Validates that the NRF url can be set in the application relation data.
+
+        Args:
+            url (str): NRF url.
+
+        Raises:
+            RuntimeError: If the unit is not leader.
+            ValueError: If the url is not valid.
+        """
+        if not self.charm.unit.is_leader():
+            raise RuntimeError("Unit must be leader to set application relation data.")
+        if not _url_is_valid(url):
+            raise ValueError(f"Invalid url: {url}")
+
     def set_nrf_information(
         self,
         url: str,
@@ -267,10 +299,7 @@ class NRFProvides(Object):
         Returns:
             None
         """
-        if not self.charm.unit.is_leader():
-            raise RuntimeError("Unit must be leader to set application relation data.")
-        if not data_matches_provider_schema(data={"url": url}):
-            raise ValueError(f"Invalid url: {url}")
+        self._validate_nrf_information(url)
 
         relation = self.model.get_relation(
             relation_name=self.relation_name, relation_id=relation_id
@@ -284,19 +313,20 @@ class NRFProvides(Object):
     def set_nrf_information_in_all_relations(self, url: str) -> None:
         """Sets NRF url in applications for all applications.
 
+        Relations whose application data already holds the url are not written again.
+
         Args:
             url (str): NRF url.
 
         Returns:
             None
         """
-        if not self.charm.unit.is_leader():
-            raise RuntimeError("Unit must be leader to set application relation data.")
-        if not data_matches_provider_schema(data={"url": url}):
-            raise ValueError(f"Invalid url: {url}")
+        self._validate_nrf_information(url)
 
         relations = self.model.relations[self.relation_name]
         if not relations:
             raise RuntimeError(f"Relation {self.relation_name} not created yet.")
         for relation in relations:
+            if relation.data[self.charm.app].get("url") == url:
+                continue
             relation.data[self.charm.app].update({"url": url})
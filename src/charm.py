@@ -4,10 +4,13 @@
 
 """Charmed operator for the SD-Core NRF service."""
 
+import hashlib
 import logging
+import os
+from functools import lru_cache
 from ipaddress import IPv4Address
 from subprocess import check_output
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from charms.data_platform_libs.v0.data_interfaces import DatabaseRequires  # type: ignore[import]
 from charms.observability_libs.v1.kubernetes_service_patch import (  # type: ignore[import]
@@ -21,17 +24,21 @@ from charms.tls_certificates_interface.v2.tls_certificates import (  # type: ign
     generate_csr,
     generate_private_key,
 )
-from jinja2 import Environment, FileSystemLoader  # type: ignore[import]
 from lightkube.models.core_v1 import ServicePort
 from ops.charm import CharmBase, EventBase, RelationJoinedEvent
 from ops.main import main
 from ops.model import ActiveStatus, BlockedStatus, ModelError, WaitingStatus
-from ops.pebble import Layer
+from ops.pebble import Layer, PathError
+
+if TYPE_CHECKING:
+    from jinja2 import Environment  # type: ignore[import]
 
 logger = logging.getLogger(__name__)
 
 BASE_CONFIG_PATH = "/etc/nrf"
 CONFIG_FILE_NAME = "nrfcfg.yaml"
+CONFIG_FILE_PATH = f"{BASE_CONFIG_PATH}/{CONFIG_FILE_NAME}"
+CONFIG_FILE_HASH_PATH = f"{CONFIG_FILE_PATH}.sha256"
 DATABASE_NAME = "free5gc"
 NRF_SBI_PORT = 29510
 DATABASE_RELATION_NAME = "database"
@@ -41,8 +48,34 @@ PRIVATE_KEY_NAME = "nrf.key"
 CSR_NAME = "nrf.csr"
 CERTIFICATE_NAME = "nrf.pem"
 CERTIFICATE_COMMON_NAME = "nrf.sdcore"
+JINJA_BYTECODE_CACHE_DIR = ".jinja2-cache"  # Relative to the charm directory
+SERVICE_PORTS = [
+    ServicePort(name="sbi", port=NRF_SBI_PORT),
+]
+ENVIRONMENT_VARIABLES = {
+    "GRPC_GO_LOG_VERBOSITY_LEVEL": "99",
+    "GRPC_GO_LOG_SEVERITY_LEVEL": "info",
+    "GRPC_TRACE": "all",
+    "GRPC_VERBOSITY": "debug",
+    "MANAGED_BY_CONFIG_POD": "true",
+}
+PEBBLE_LAYER = Layer(
+    {
+        "summary": "nrf layer",
+        "description": "pebble config layer for nrf",
+        "services": {
+            "nrf": {
+                "override": "replace",
+                "startup": "enabled",
+                "command": f"/bin/nrf --nrfcfg {CONFIG_FILE_PATH}",
+                "environment": ENVIRONMENT_VARIABLES,
+            },
+        },
+    }
+)
 
 
+@lru_cache(maxsize=1)
 def _get_pod_ip() -> Optional[str]:
     """Returns the pod IP using juju client.
 
@@ -53,6 +86,45 @@ def _get_pod_ip() -> Optional[str]:
     return str(IPv4Address(ip_address.decode().strip())) if ip_address else None
 
 
+@lru_cache(maxsize=1)
+def _get_jinja_environment() -> "Environment":
+    """Returns the Jinja environment used to render the workload templates.
+
+    Returns:
+        Environment: Jinja environment
+    """
+    from jinja2 import (  # type: ignore[import]
+        Environment,
+        FileSystemBytecodeCache,
+        FileSystemLoader,
+    )
+
+    bytecode_cache = None
+    try:
+        os.makedirs(JINJA_BYTECODE_CACHE_DIR, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(directory=JINJA_BYTECODE_CACHE_DIR)
+    except OSError as e:
+        logger.warning("Jinja bytecode cache disabled: %s", e)
+    return Environment(
+        loader=FileSystemLoader("src/templates/"),
+        auto_reload=False,
+        bytecode_cache=bytecode_cache,
+    )
+
+
+def _sha256(content: str) -> str:
+    """Returns the SHA-256 hex digest of the given content.
+
+    Args:
+        content: Text content
+
+    Returns:
+        str: Hex digest of the content
+    """
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+@lru_cache(maxsize=1)
 def _render_config(
     database_name: str,
     database_url: str,
@@ -72,8 +144,7 @@ def _render_config(
     Returns:
         str: Rendered config file content
     """
-    jinja2_environment = Environment(loader=FileSystemLoader("src/templates/"))
-    template = jinja2_environment.get_template("nrfcfg.yaml.j2")
+    template = _get_jinja_environment().get_template("nrfcfg.yaml.j2")
     content = template.render(
         database_name=database_name,
         database_url=database_url,
@@ -94,6 +165,8 @@ class NRFOperatorCharm(CharmBase):
             raise NotImplementedError("Scaling is not implemented for this charm")
         self._container_name = self._service_name = "nrf"
         self._container = self.unit.get_container(self._container_name)
+        self._last_pushed_config_sha: Optional[str] = None
+        self._pebble_layer_applied = False
         self._database = DatabaseRequires(
             self, relation_name=DATABASE_RELATION_NAME, database_name=DATABASE_NAME
         )
@@ -102,9 +175,7 @@ class NRFOperatorCharm(CharmBase):
 
         self._service_patcher = KubernetesServicePatch(
             charm=self,
-            ports=[
-                ServicePort(name="sbi", port=NRF_SBI_PORT),
-            ],
+            ports=SERVICE_PORTS,
         )
         self.framework.observe(self.on.database_relation_joined, self._configure_nrf)
         self.framework.observe(self.on.nrf_pebble_ready, self._configure_nrf)
@@ -144,7 +215,8 @@ class NRFOperatorCharm(CharmBase):
         if not self._database_is_available():
             self.unit.status = WaitingStatus("Waiting for the database to be available")
             return
-        if not self._get_database_uri():
+        database_uri = self._get_database_uri()
+        if not database_uri:
             self.unit.status = WaitingStatus("Waiting for database URI")
             event.defer()
             return
@@ -152,11 +224,12 @@ class NRFOperatorCharm(CharmBase):
             self.unit.status = WaitingStatus("Waiting for storage to be attached")
             event.defer()
             return
-        if not _get_pod_ip():
+        pod_ip = _get_pod_ip()
+        if not pod_ip:
             self.unit.status = WaitingStatus("Waiting for pod IP address to be available")
             event.defer()
             return
-        needs_restart = self._generate_config_file()
+        needs_restart = self._generate_config_file(database_url=database_uri, pod_ip=pod_ip)
         self._configure_workload(restart=needs_restart)
         self._publish_nrf_info_for_all_requirers()
         self.unit.status = ActiveStatus()
@@ -293,7 +366,7 @@ class NRFOperatorCharm(CharmBase):
         self._container.push(path=f"{CERTS_DIR_PATH}/{CSR_NAME}", source=csr.decode().strip())
         logger.info("Pushed CSR to workload")
 
-    def _generate_config_file(self) -> bool:
+    def _generate_config_file(self, database_url: str, pod_ip: str) -> bool:
         """Handles creation of the NRF config file.
 
         Generates NRF config file based on a given template.
@@ -301,12 +374,16 @@ class NRFOperatorCharm(CharmBase):
         Calls `_configure_workload` function to forcibly restart the NRF service in order
         to fetch new config.
 
+        Args:
+            database_url: URL of the database
+            pod_ip: IP of the NRF pod
+
         Returns:
             bool: Whether the config file was updated so the service should be restarted.
         """
         content = _render_config(
-            database_url=self._database_info()["uris"].split(",")[0],
-            nrf_ip=_get_pod_ip(),  # type: ignore[arg-type]
+            database_url=database_url,
+            nrf_ip=pod_ip,
             database_name=DATABASE_NAME,
             nrf_sbi_port=NRF_SBI_PORT,
             scheme="https" if self._certificate_is_stored() else "http",
@@ -320,23 +397,42 @@ class NRFOperatorCharm(CharmBase):
 
     def _configure_workload(self, restart: bool = False) -> None:
         """Configures pebble layer for the nrf container."""
+        if self._pebble_layer_applied and not restart:
+            return
         plan = self._container.get_plan()
         layer = self._pebble_layer
         if plan.services != layer.services or restart:
             self._container.add_layer("nrf", layer, combine=True)
             self._container.restart(self._service_name)
+        self._pebble_layer_applied = True
 
     def _config_file_content_matches(self, content: str) -> bool:
         """Returns whether the nrfcfg config file content matches the provided content.
 
+        The digest of a matching config file is stored if it was missing.
+
         Returns:
             bool: Whether the nrfcfg config file content matches
         """
-        if not self._container.exists(path=f"{BASE_CONFIG_PATH}/{CONFIG_FILE_NAME}"):
+        content_sha = _sha256(content)
+        if content_sha == self._last_pushed_config_sha:
+            return True
+        try:
+            pushed_sha = self._container.pull(path=CONFIG_FILE_HASH_PATH)
+        except PathError:
+            pass
+        else:
+            return pushed_sha.read() == content_sha and self._container.exists(
+                path=CONFIG_FILE_PATH
+            )
+        try:
+            existing_content = self._container.pull(path=CONFIG_FILE_PATH)
+        except PathError:
             return False
-        existing_content = self._container.pull(path=f"{BASE_CONFIG_PATH}/{CONFIG_FILE_NAME}")
         if existing_content.read() != content:
             return False
+        self._container.push(path=CONFIG_FILE_HASH_PATH, source=content_sha)
+        self._last_pushed_config_sha = content_sha
         return True
 
     def _on_fiveg_nrf_relation_joined(self, event: RelationJoinedEvent) -> None:
@@ -372,14 +468,15 @@ class NRFOperatorCharm(CharmBase):
         return bool(self.model.relations[relation_name])
 
     def _push_config_file(self, content: str) -> None:
-        """Pushes config file to workload.
+        """Pushes config file to workload, along with the digest of its content.
 
         Args:
             content: config file content
         """
-        if not self._container.can_connect():
-            return
-        self._container.push(path=f"{BASE_CONFIG_PATH}/{CONFIG_FILE_NAME}", source=content)
+        content_sha = _sha256(content)
+        self._container.push(path=CONFIG_FILE_PATH, source=content)
+        self._container.push(path=CONFIG_FILE_HASH_PATH, source=content_sha)
+        self._last_pushed_config_sha = content_sha
         logger.info("Pushed %s config file", CONFIG_FILE_NAME)
 
     def _database_is_available(self) -> bool:
@@ -390,26 +487,14 @@ class NRFOperatorCharm(CharmBase):
         """
         return self._database.is_resource_created()
 
-    def _database_info(self) -> dict:
-        """Returns the database data.
-
-        Returns:
-            Dict: The database data.
-        """
-        if not self._database_is_available():
-            raise RuntimeError(f"Database `{DATABASE_NAME}` is not available")
-        return self._database.fetch_relation_data()[self._database.relations[0].id]
-
     def _get_database_uri(self) -> str:
         """Returns the database URI.
 
         Returns:
             str: The database URI.
         """
-        try:
-            return self._database_info()["uris"].split(",")[0]
-        except KeyError:
-            return ""
+        database_info: dict = next(iter(self._database.fetch_relation_data().values()), {})
+        return database_info.get("uris", "").split(",")[0]
 
     @property
     def _pebble_layer(self) -> Layer:
@@ -418,35 +503,7 @@ class NRFOperatorCharm(CharmBase):
         Returns:
             Layer: Pebble Layer
         """
-        return Layer(
-            {
-                "summary": "nrf layer",
-                "description": "pebble config layer for nrf",
-                "services": {
-                    "nrf": {
-                        "override": "replace",
-                        "startup": "enabled",
-                        "command": f"/bin/nrf --nrfcfg {BASE_CONFIG_PATH}/{CONFIG_FILE_NAME}",  # noqa: E501
-                        "environment": self._environment_variables,
-                    },
-                },
-            }
-        )
-
-    @property
-    def _environment_variables(self) -> dict:
-        """Returns workload service environment variables.
-
-        Returns:
-            dict: Environment variables
-        """
-        return {
-            "GRPC_GO_LOG_VERBOSITY_LEVEL": "99",
-            "GRPC_GO_LOG_SEVERITY_LEVEL": "info",
-            "GRPC_TRACE": "all",
-            "GRPC_VERBOSITY": "debug",
-            "MANAGED_BY_CONFIG_POD": "true",
-        }
+        return PEBBLE_LAYER
 
     def _nrf_service_is_running(self) -> bool:
         """Returns whether the NRF service is running.
@@ -118,3 +118,17 @@ class TestFiveGNRFProvider(unittest.TestCase):
 
         self.assertEqual(relation_data_1["url"], expected_nrf_url)
         self.assertEqual(relation_data_2["url"], expected_nrf_url)
+
+    def test_given_url_already_in_relation_data_when_set_nrf_information_in_all_relations_then_relation_data_is_not_written(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        expected_nrf_url = "https://nrf.example.com"
+        self._create_relation(remote_app_name=self.remote_app_name)
+
+        with patch("ops.model.RelationDataContent.update") as patch_update:
+            self.harness.charm.nrf_provider.set_nrf_information_in_all_relations(
+                url=expected_nrf_url
+            )
+
+        patch_update.assert_not_called()
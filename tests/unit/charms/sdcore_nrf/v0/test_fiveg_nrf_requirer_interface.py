@@ -73,6 +73,19 @@ class TestFiveGNRFRequirer(unittest.TestCase):
 
         patch_on_nrf_available.assert_not_called()
 
+    @patch(f"{DUMMY_REQUIRER_CHARM}._on_nrf_available")
+    def test_given_invalid_nrf_url_in_relation_data_when_relation_changed_then_nrf_available_event_not_emitted(  # noqa: E501
+        self, patch_on_nrf_available
+    ):
+        relation_id = self._create_relation(remote_app_name=self.remote_app_name)
+        relation_data = {"url": "invalid url"}
+
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=self.remote_app_name, key_values=relation_data
+        )
+
+        patch_on_nrf_available.assert_not_called()
+
     def test_given_invalid_nrf_information_in_relation_data_when_relation_changed_then_error_is_logged(  # noqa: E501
         self,
     ):
@@ -1,30 +1,102 @@
 # Copyright 2023 Canonical Ltd.
 # See LICENSE file for licensing details.
 
+import glob
+import hashlib
+import os
+import tempfile
 import unittest
 from io import StringIO
-from unittest.mock import Mock, patch
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import DEFAULT, Mock, call, patch
 
+from charms.data_platform_libs.v0.data_interfaces import DatabaseRequires
+from charms.sdcore_nrf.v0.fiveg_nrf import NRFProvides
+from charms.tls_certificates_interface.v2.tls_certificates import TLSCertificatesRequiresV2
 from ops import testing
-from ops.model import ActiveStatus, BlockedStatus, WaitingStatus
+from ops.model import ActiveStatus, BlockedStatus, Container, WaitingStatus
+from ops.pebble import PathError, Plan
 
-from charm import NRFOperatorCharm  # type: ignore[import]
+import charm  # type: ignore[import]
+from charm import NRFOperatorCharm, _get_pod_ip  # type: ignore[import]
 
 DB_APPLICATION_NAME = "mongodb-k8s"
 BASE_CONFIG_PATH = "/etc/nrf"
 CONFIG_FILE_NAME = "nrfcfg.yaml"
+EXPECTED_CONFIG = Path("tests/unit/expected_config/config.conf").read_text().strip()
+EXPECTED_PEBBLE_PLAN = {
+    "services": {
+        "nrf": {
+            "override": "replace",
+            "command": "/bin/nrf --nrfcfg /etc/nrf/nrfcfg.yaml",
+            "startup": "enabled",
+            "environment": {
+                "GRPC_GO_LOG_VERBOSITY_LEVEL": "99",
+                "GRPC_GO_LOG_SEVERITY_LEVEL": "info",
+                "GRPC_TRACE": "all",
+                "GRPC_VERBOSITY": "debug",
+                "MANAGED_BY_CONFIG_POD": "true",
+            },
+        }
+    },
+}
 
 
 class TestCharm(unittest.TestCase):
-    @patch(
-        "charm.KubernetesServicePatch",
-        lambda charm, ports: None,
-    )
+    @classmethod
+    def setUpClass(cls):
+        kubernetes_service_patcher = patch.object(
+            charm, "KubernetesServicePatch", lambda charm, ports: None
+        )
+        kubernetes_service_patcher.start()
+        cls.addClassCleanup(kubernetes_service_patcher.stop)
+        jinja_bytecode_cache_dir = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(jinja_bytecode_cache_dir.cleanup)
+        jinja_bytecode_cache_patcher = patch.object(
+            charm, "JINJA_BYTECODE_CACHE_DIR", jinja_bytecode_cache_dir.name
+        )
+        jinja_bytecode_cache_patcher.start()
+        cls.addClassCleanup(jinja_bytecode_cache_patcher.stop)
+        cls.addClassCleanup(charm._get_jinja_environment.cache_clear)
+
     def setUp(self):
+        check_output_patcher = patch.object(charm, "check_output")
+        self.addCleanup(check_output_patcher.stop)
+        self.patch_check_output = check_output_patcher.start()
+        self.patch_check_output.return_value = b"1.1.1.1"
+        container_patcher = patch.multiple(Container, pull=DEFAULT, push=DEFAULT, exists=DEFAULT)
+        self.addCleanup(container_patcher.stop)
+        container_mocks = container_patcher.start()
+        self.patch_pull = container_mocks["pull"]
+        self.patch_push = container_mocks["push"]
+        self.patch_exists = container_mocks["exists"]
+        self.patch_exists.return_value = False
         self.harness = testing.Harness(NRFOperatorCharm)
         self.addCleanup(self.harness.cleanup)
+        self.addCleanup(_get_pod_ip.cache_clear)
         self.harness.set_leader(is_leader=True)
         self.harness.begin()
+        self.app_name = self.harness.charm.app.name
+
+    def _clear_render_caches(self) -> None:
+        """Drops the memoized Jinja environment and rendered config."""
+        charm._get_jinja_environment.cache_clear()
+        charm._render_config.cache_clear()
+
+    def _render_expected_config(self) -> str:
+        """Renders the config file with the inputs matching the expected config.
+
+        Returns:
+            str: Rendered config file content
+        """
+        return charm._render_config(
+            database_name="free5gc",
+            database_url="http://dummy",
+            nrf_ip="1.1.1.1",
+            nrf_sbi_port=29510,
+            scheme="http",
+        )
 
     def _create_database_relation(self) -> int:
         """Create a database relation.
@@ -44,31 +116,16 @@ class TestCharm(unittest.TestCase):
 
     def _database_is_available(self) -> None:
         """Create a database relation and set the database information."""
-        database_relation_id = self._create_database_relation()
-        self.harness.update_relation_data(
-            relation_id=database_relation_id,
-            app_or_unit=DB_APPLICATION_NAME,
-            key_values={
+        self.harness.add_relation(
+            relation_name="database",
+            remote_app=DB_APPLICATION_NAME,
+            app_data={
                 "username": "dummy",
                 "password": "dummy",
                 "uris": "http://dummy",
             },
         )
 
-    @staticmethod
-    def _read_file(path: str) -> str:
-        """Reads a file and returns as a string.
-
-        Args:
-            path (str): path to the file.
-
-        Returns:
-            str: content of the file.
-        """
-        with open(path, "r") as f:
-            content = f.read()
-        return content
-
     def test_given_database_relation_not_created_when_pebble_ready_then_status_is_blocked(self):
         self.harness.container_pebble_ready(container_name="nrf")
 
@@ -87,7 +144,7 @@ class TestCharm(unittest.TestCase):
             WaitingStatus("Waiting for the database to be available"),
         )
 
-    @patch("charms.data_platform_libs.v0.data_interfaces.DatabaseRequires.is_resource_created")
+    @patch.object(DatabaseRequires, "is_resource_created")
     def test_given_database_information_not_available_when_pebble_ready_then_status_is_waiting(
         self,
         patch_is_resource_created,
@@ -111,211 +168,208 @@ class TestCharm(unittest.TestCase):
             WaitingStatus("Waiting for storage to be attached"),
         )
 
-    @patch("ops.model.Container.exists")
-    @patch("ops.model.Container.push")
-    @patch("ops.model.Container.pull")
-    @patch("charm.check_output")
     def test_given_database_info_and_storage_attached_when_pebble_ready_then_config_file_is_rendered_and_pushed(  # noqa: E501
         self,
-        patch_check_output,
-        patch_pull,
-        patch_push,
-        patch_exists,
     ):
-        patch_check_output.return_value = b"1.1.1.1"
-        patch_pull.return_value = StringIO("dummy")
-        patch_exists.side_effect = [True, False, False]
+        self.patch_pull.return_value = StringIO("dummy")
+        self.patch_exists.side_effect = [True, False, False]
+        self._database_is_available()
+        self.harness.container_pebble_ready(container_name="nrf")
+        self.patch_push.assert_any_call(
+            path=f"{BASE_CONFIG_PATH}/{CONFIG_FILE_NAME}",
+            source=EXPECTED_CONFIG,
+        )
+
+    def test_given_database_info_and_storage_attached_when_pebble_ready_then_config_file_digest_is_pushed(  # noqa: E501
+        self,
+    ):
+        self.patch_pull.return_value = StringIO("dummy")
+        self.patch_exists.side_effect = [True, False, False]
         self._database_is_available()
         self.harness.container_pebble_ready(container_name="nrf")
-        with open("tests/unit/expected_config/config.conf") as expected_config_file:
-            expected_content = expected_config_file.read()
-            patch_push.assert_called_with(
-                path=f"{BASE_CONFIG_PATH}/{CONFIG_FILE_NAME}",
-                source=expected_content.strip(),
-            )
-
-    @patch("ops.model.Container.exists")
-    @patch("ops.model.Container.push")
-    @patch("ops.model.Container.pull")
-    @patch("charm.check_output")
+        self.patch_push.assert_called_with(
+            path=f"{BASE_CONFIG_PATH}/{CONFIG_FILE_NAME}.sha256",
+            source=hashlib.sha256(EXPECTED_CONFIG.encode()).hexdigest(),
+        )
+
     def test_given_content_of_config_file_not_changed_when_pebble_ready_then_config_file_is_not_pushed(  # noqa: E501
         self,
-        patch_check_output,
-        patch_pull,
-        patch_push,
-        patch_exists,
     ):
-        patch_check_output.return_value = b"1.1.1.1"
-        patch_pull.side_effect = [
-            StringIO(self._read_file("tests/unit/expected_config/config.conf").strip()),
+        self.patch_pull.side_effect = [
+            StringIO(hashlib.sha256(EXPECTED_CONFIG.encode()).hexdigest()),
         ]
-        patch_exists.side_effect = [True, False, True]
+        self.patch_exists.side_effect = [True, False, True]
         self._database_is_available()
         self.harness.container_pebble_ready(container_name="nrf")
-        patch_push.assert_not_called()
+        self.patch_push.assert_not_called()
 
-    @patch("ops.model.Container.exists")
-    @patch("ops.model.Container.push")
-    @patch("ops.model.Container.pull")
-    @patch("charm.check_output")
-    def test_given_config_pushed_when_pebble_ready_then_pebble_plan_is_applied(
+    def test_given_config_file_digest_matches_and_config_file_not_in_workload_when_pebble_ready_then_config_file_is_pushed(  # noqa: E501
+        self,
+    ):
+        self.patch_pull.side_effect = [
+            StringIO(hashlib.sha256(EXPECTED_CONFIG.encode()).hexdigest()),
+        ]
+        self.patch_exists.side_effect = [True, False, False]
+        self._database_is_available()
+        self.harness.container_pebble_ready(container_name="nrf")
+        self.patch_push.assert_any_call(
+            path=f"{BASE_CONFIG_PATH}/{CONFIG_FILE_NAME}",
+            source=EXPECTED_CONFIG,
+        )
+
+    def test_given_config_file_digest_not_stored_and_content_not_changed_when_pebble_ready_then_only_config_file_digest_is_pushed(  # noqa: E501
         self,
-        patch_check_output,
-        patch_pull,
-        patch_push,
-        patch_exists,
     ):
-        patch_check_output.return_value = b"1.1.1.1"
-        patch_pull.return_value = StringIO(
-            self._read_file("tests/unit/expected_config/config.conf").strip()
+        self.patch_pull.side_effect = [
+            PathError(kind="not-found", message="File not found"),
+            StringIO(EXPECTED_CONFIG),
+        ]
+        self.patch_exists.side_effect = [True, False]
+        self._database_is_available()
+        self.harness.container_pebble_ready(container_name="nrf")
+        self.patch_push.assert_called_once_with(
+            path=f"{BASE_CONFIG_PATH}/{CONFIG_FILE_NAME}.sha256",
+            source=hashlib.sha256(EXPECTED_CONFIG.encode()).hexdigest(),
         )
-        patch_exists.return_value = True
 
+    def test_given_config_file_not_in_workload_when_pebble_ready_then_config_file_is_pushed(
+        self,
+    ):
+        self.patch_pull.side_effect = PathError(kind="not-found", message="File not found")
+        self.patch_exists.side_effect = [True, False, False]
         self._database_is_available()
+        self.harness.container_pebble_ready(container_name="nrf")
+        self.patch_push.assert_any_call(
+            path=f"{BASE_CONFIG_PATH}/{CONFIG_FILE_NAME}",
+            source=EXPECTED_CONFIG,
+        )
 
+    def test_given_config_file_pushed_by_charm_when_pebble_ready_again_then_config_file_is_not_pulled(  # noqa: E501
+        self,
+    ):
+        self.patch_pull.return_value = StringIO("dummy")
+        self.patch_exists.return_value = True
+        self._database_is_available()
         self.harness.container_pebble_ready(container_name="nrf")
 
-        expected_plan = {
-            "services": {
-                "nrf": {
-                    "override": "replace",
-                    "command": "/bin/nrf --nrfcfg /etc/nrf/nrfcfg.yaml",
-                    "startup": "enabled",
-                    "environment": {
-                        "GRPC_GO_LOG_VERBOSITY_LEVEL": "99",
-                        "GRPC_GO_LOG_SEVERITY_LEVEL": "info",
-                        "GRPC_TRACE": "all",
-                        "GRPC_VERBOSITY": "debug",
-                        "MANAGED_BY_CONFIG_POD": "true",
-                    },
-                }
-            },
-        }
+        self.harness.container_pebble_ready(container_name="nrf")
+
+        self.patch_pull.assert_called_once()
+
+    def test_given_bytecode_cache_dir_when_config_rendered_then_template_bytecode_is_cached(
+        self,
+    ):
+        self._clear_render_caches()
+        self.addCleanup(self._clear_render_caches)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with patch.object(charm, "JINJA_BYTECODE_CACHE_DIR", cache_dir):
+                self._render_expected_config()
+
+            self.assertTrue(glob.glob(os.path.join(cache_dir, "__jinja2_*.cache")))
+
+    @patch.object(os, "makedirs")
+    def test_given_bytecode_cache_dir_cannot_be_created_when_config_rendered_then_config_is_rendered_without_cache(  # noqa: E501
+        self, patch_makedirs
+    ):
+        patch_makedirs.side_effect = OSError("Read-only file system")
+        self._clear_render_caches()
+        self.addCleanup(self._clear_render_caches)
+
+        with self.assertLogs(charm.logger, level="WARNING") as logs:
+            content = self._render_expected_config()
+
+        self.assertEqual(content, EXPECTED_CONFIG)
+        self.assertIn("Jinja bytecode cache disabled", logs.output[0])
+
+    def test_given_config_pushed_when_pebble_ready_then_pebble_plan_is_applied(
+        self,
+    ):
+        self.patch_pull.return_value = StringIO(EXPECTED_CONFIG)
+        self.patch_exists.return_value = True
+
+        self._database_is_available()
+
+        self.harness.container_pebble_ready(container_name="nrf")
 
         updated_plan = self.harness.get_container_pebble_plan("nrf").to_dict()
 
-        self.assertEqual(expected_plan, updated_plan)
+        self.assertEqual(EXPECTED_PEBBLE_PLAN, updated_plan)
+
+    @patch.object(Container, "get_plan")
+    def test_given_pebble_layer_applied_when_workload_configured_again_then_plan_is_not_fetched(
+        self, patch_get_plan
+    ):
+        patch_get_plan.return_value = Plan("services: {}")
+        self.harness.set_can_connect(container="nrf", val=True)
+        self.harness.charm._configure_workload()
+
+        self.harness.charm._configure_workload()
+
+        patch_get_plan.assert_called_once()
 
-    @patch("ops.model.Container.pull")
-    @patch("ops.model.Container.exists")
-    @patch("ops.model.Container.push")
-    @patch("charm.check_output")
     def test_given_database_relation_is_created_and_config_file_is_written_when_pebble_ready_then_status_is_active(  # noqa: E501
         self,
-        patch_check_output,
-        patch_push,
-        patch_exists,
-        patch_pull,
     ):
-        patch_check_output.return_value = b"1.1.1.1"
-        patch_pull.return_value = StringIO(
-            self._read_file("tests/unit/expected_config/config.conf").strip()
-        )
-        patch_exists.return_value = True
+        self.patch_pull.return_value = StringIO(EXPECTED_CONFIG)
+        self.patch_exists.return_value = True
 
         self._database_is_available()
 
         self.harness.container_pebble_ready(container_name="nrf")
-        self.harness.container_pebble_ready("nrf")
 
         self.assertEqual(self.harness.model.unit.status, ActiveStatus())
 
-    @patch("ops.model.Container.pull")
-    @patch("ops.model.Container.exists")
-    @patch("ops.model.Container.push")
-    @patch("charm.check_output")
     def test_given_ip_not_available_when_pebble_ready_then_status_is_waiting(
         self,
-        patch_check_output,
-        patch_push,
-        patch_exists,
-        patch_pull,
     ):
-        patch_check_output.return_value = b""
-        patch_pull.return_value = StringIO(
-            self._read_file("tests/unit/expected_config/config.conf").strip()
-        )
-        patch_exists.return_value = True
+        self.patch_check_output.return_value = b""
+        self.patch_pull.return_value = StringIO(EXPECTED_CONFIG)
+        self.patch_exists.return_value = True
 
         self._database_is_available()
 
         self.harness.container_pebble_ready(container_name="nrf")
-        self.harness.container_pebble_ready("nrf")
 
         self.assertEqual(
             self.harness.model.unit.status,
             WaitingStatus("Waiting for pod IP address to be available"),
         )
 
-    @patch("ops.model.Container.push", new=Mock)
-    @patch("ops.model.Container.pull")
-    @patch("ops.model.Container.exists")
-    @patch("charm.check_output")
-    def test_given_http_nrf_url_and_service_is_running_when_fiveg_nrf_relation_joined_then_nrf_url_is_in_relation_databag(  # noqa: E501
-        self, patch_check_output, patch_exists, patch_pull
+    def test_given_service_is_running_when_fiveg_nrf_relation_joined_then_nrf_url_is_in_relation_databag(  # noqa: E501
+        self,
     ):
-        patch_check_output.return_value = b"1.1.1.1"
-        patch_exists.side_effect = [True, False, False, False]
-        patch_pull.return_value = StringIO(
-            self._read_file("tests/unit/expected_config/config.conf").strip()
-        )
-
+        self.patch_pull.side_effect = lambda *args, **kwargs: StringIO(EXPECTED_CONFIG)
         self._database_is_available()
+        cases = [
+            (False, "http://nrf:29510"),
+            (True, "https://nrf:29510"),
+        ]
 
-        self.harness.set_can_connect(container="nrf", val=True)
-        self.harness.container_pebble_ready("nrf")
-
-        relation_id = self.harness.add_relation(
-            relation_name="fiveg-nrf",
-            remote_app="nrf-requirer",
-        )
-        self.harness.add_relation_unit(relation_id=relation_id, remote_unit_name="nrf-requirer/0")
-        relation_data = self.harness.get_relation_data(
-            relation_id=relation_id, app_or_unit=self.harness.charm.app.name
-        )
-        self.assertEqual(relation_data["url"], "http://nrf:29510")
-
-    @patch("ops.model.Container.push", new=Mock)
-    @patch("ops.model.Container.pull")
-    @patch("ops.model.Container.exists")
-    @patch("charm.check_output")
-    def test_given_https_nrf_url_and_service_is_running_when_fiveg_nrf_relation_joined_then_nrf_url_is_in_relation_databag(  # noqa: E501
-        self, patch_check_output, patch_exists, patch_pull
-    ):
-        patch_check_output.return_value = b"1.1.1.1"
-        patch_exists.return_value = True
-        patch_pull.return_value = StringIO(
-            self._read_file("tests/unit/expected_config/config.conf").strip()
-        )
-
-        self._database_is_available()
-
-        self.harness.set_can_connect(container="nrf", val=True)
-        self.harness.container_pebble_ready("nrf")
-
-        relation_id = self.harness.add_relation(
-            relation_name="fiveg-nrf",
-            remote_app="nrf-requirer",
-        )
-        self.harness.add_relation_unit(relation_id=relation_id, remote_unit_name="nrf-requirer/0")
-        relation_data = self.harness.get_relation_data(
-            relation_id=relation_id, app_or_unit=self.harness.charm.app.name
-        )
-        self.assertEqual(relation_data["url"], "https://nrf:29510")
+        for certificate_is_stored, expected_url in cases:
+            with self.subTest(certificate_is_stored=certificate_is_stored):
+                self.patch_exists.side_effect = (
+                    lambda path, stored=certificate_is_stored: path == BASE_CONFIG_PATH or stored
+                )
+                self.harness.container_pebble_ready("nrf")
+
+                relation_id = self.harness.add_relation(
+                    relation_name="fiveg-nrf",
+                    remote_app="nrf-requirer",
+                )
+                self.harness.add_relation_unit(
+                    relation_id=relation_id, remote_unit_name="nrf-requirer/0"
+                )
+                nrf_url = self.harness.get_relation_data(
+                    relation_id=relation_id, app_or_unit=self.app_name
+                ).get("url")
+                self.harness.remove_relation(relation_id)
+                self.assertEqual(nrf_url, expected_url)
 
-    @patch("ops.model.Container.push", new=Mock)
-    @patch("ops.model.Container.pull")
-    @patch("ops.model.Container.exists")
-    @patch("charm.check_output")
     def test_service_starts_running_after_nrf_relation_joined_when_fiveg_pebble_ready_then_nrf_url_is_in_relation_databag(  # noqa: E501
-        self, patch_check_output, patch_exists, patch_pull
+        self,
     ):
-        patch_check_output.return_value = b"1.1.1.1"
-        patch_exists.side_effect = [True, False, False, False]
-        patch_pull.side_effect = [
-            StringIO(self._read_file("tests/unit/expected_config/config.conf").strip()),
-            StringIO(self._read_file("tests/unit/expected_config/config.conf").strip()),
-        ]
+        self.patch_exists.side_effect = [True, False, False, False]
+        self.patch_pull.side_effect = lambda *args, **kwargs: StringIO(EXPECTED_CONFIG)
 
         self.harness.set_can_connect(container="nrf", val=False)
 
@@ -328,30 +382,36 @@ class TestCharm(unittest.TestCase):
             relation_name="fiveg-nrf",
             remote_app="nrf-requirer-2",
         )
-        self.harness.add_relation_unit(
-            relation_id=relation_1_id, remote_unit_name="nrf-requirer-1/0"
-        )
-        self.harness.add_relation_unit(
-            relation_id=relation_2_id, remote_unit_name="nrf-requirer-2/0"
-        )
 
         self._database_is_available()
 
         self.harness.container_pebble_ready("nrf")
 
         relation_1_data = self.harness.get_relation_data(
-            relation_id=relation_1_id, app_or_unit=self.harness.charm.app.name
+            relation_id=relation_1_id, app_or_unit=self.app_name
         )
         relation_2_data = self.harness.get_relation_data(
-            relation_id=relation_2_id, app_or_unit=self.harness.charm.app.name
+            relation_id=relation_2_id, app_or_unit=self.app_name
         )
         self.assertEqual(relation_1_data["url"], "http://nrf:29510")
         self.assertEqual(relation_2_data["url"], "http://nrf:29510")
 
-    @patch("charm.generate_private_key")
-    @patch("ops.model.Container.push")
+    @patch.object(NRFProvides, "set_nrf_information_in_all_relations")
+    def test_given_fiveg_nrf_relation_created_when_publish_nrf_info_then_nrf_url_is_set_in_all_relations(  # noqa: E501
+        self, patch_set_nrf_information_in_all_relations
+    ):
+        self.harness.add_relation(
+            relation_name="fiveg-nrf",
+            remote_app="nrf-requirer",
+        )
+
+        self.harness.charm._publish_nrf_info_for_all_requirers()
+
+        patch_set_nrf_information_in_all_relations.assert_called_once_with("http://nrf:29510")
+
+    @patch.object(charm, "generate_private_key")
     def test_given_can_connect_when_on_certificates_relation_created_then_private_key_is_generated(
-        self, patch_push, patch_generate_private_key
+        self, patch_generate_private_key
     ):
         private_key = b"whatever key content"
         self.harness.set_can_connect(container="nrf", val=True)
@@ -359,122 +419,97 @@ class TestCharm(unittest.TestCase):
 
         self.harness.charm._on_certificates_relation_created(event=Mock)
 
-        patch_push.assert_called_with(path="/support/TLS/nrf.key", source=private_key.decode())
+        self.patch_push.assert_called_with(
+            path="/support/TLS/nrf.key", source=private_key.decode()
+        )
 
-    @patch("ops.model.Container.remove_path")
-    @patch("ops.model.Container.exists")
+    @patch.object(Container, "remove_path")
     def test_given_certificates_are_stored_when_on_certificates_relation_broken_then_certificates_are_removed(  # noqa: E501
-        self, patch_exists, patch_remove_path
+        self, patch_remove_path
     ):
-        patch_exists.return_value = True
+        self.patch_exists.return_value = True
         self.harness.set_can_connect(container="nrf", val=True)
 
         self.harness.charm._on_certificates_relation_broken(event=Mock)
 
-        patch_remove_path.assert_any_call(path="/support/TLS/nrf.pem")
-        patch_remove_path.assert_any_call(path="/support/TLS/nrf.key")
-        patch_remove_path.assert_any_call(path="/support/TLS/nrf.csr")
-
-    @patch(
-        "charms.tls_certificates_interface.v2.tls_certificates.TLSCertificatesRequiresV2.request_certificate_creation",  # noqa: E501
-        new=Mock,
-    )
-    @patch("ops.model.Container.push")
-    @patch("charm.generate_csr")
-    @patch("ops.model.Container.pull")
-    @patch("ops.model.Container.exists")
+        self.assertCountEqual(
+            patch_remove_path.call_args_list,
+            [
+                call(path="/support/TLS/nrf.pem"),
+                call(path="/support/TLS/nrf.key"),
+                call(path="/support/TLS/nrf.csr"),
+            ],
+        )
+
+    @patch.object(TLSCertificatesRequiresV2, "request_certificate_creation", new=Mock)
+    @patch.object(charm, "generate_csr")
     def test_given_private_key_exists_when_on_certificates_relation_joined_then_csr_is_generated(
-        self, patch_exists, patch_pull, patch_generate_csr, patch_push
+        self, patch_generate_csr
     ):
         csr = b"whatever csr content"
         patch_generate_csr.return_value = csr
-        patch_pull.return_value = StringIO("private key content")
-        patch_exists.return_value = True
+        self.patch_pull.return_value = StringIO("private key content")
+        self.patch_exists.return_value = True
         self.harness.set_can_connect(container="nrf", val=True)
 
         self.harness.charm._on_certificates_relation_joined(event=Mock)
 
-        patch_push.assert_called_with(path="/support/TLS/nrf.csr", source=csr.decode())
+        self.patch_push.assert_called_with(path="/support/TLS/nrf.csr", source=csr.decode())
 
-    @patch(
-        "charms.tls_certificates_interface.v2.tls_certificates.TLSCertificatesRequiresV2.request_certificate_creation",  # noqa: E501
-    )
-    @patch("ops.model.Container.push", new=Mock)
-    @patch("charm.generate_csr")
-    @patch("ops.model.Container.pull")
-    @patch("ops.model.Container.exists")
+    @patch.object(TLSCertificatesRequiresV2, "request_certificate_creation")
+    @patch.object(charm, "generate_csr")
     def test_given_private_key_exists_when_on_certificates_relation_joined_then_cert_is_requested(
         self,
-        patch_exists,
-        patch_pull,
         patch_generate_csr,
         patch_request_certificate_creation,
     ):
         csr = b"whatever csr content"
         patch_generate_csr.return_value = csr
-        patch_pull.return_value = StringIO("private key content")
-        patch_exists.return_value = True
+        self.patch_pull.return_value = StringIO("private key content")
+        self.patch_exists.return_value = True
         self.harness.set_can_connect(container="nrf", val=True)
 
         self.harness.charm._on_certificates_relation_joined(event=Mock)
 
         patch_request_certificate_creation.assert_called_with(certificate_signing_request=csr)
 
-    @patch("ops.model.Container.pull")
-    @patch("ops.model.Container.exists")
-    @patch("ops.model.Container.push")
     def test_given_csr_matches_stored_one_when_certificate_available_then_certificate_is_pushed(
         self,
-        patch_push,
-        patch_exists,
-        patch_pull,
     ):
         csr = "Whatever CSR content"
-        patch_pull.return_value = StringIO(csr)
-        patch_exists.return_value = True
+        self.patch_pull.return_value = StringIO(csr)
+        self.patch_exists.return_value = True
         certificate = "Whatever certificate content"
-        event = Mock()
-        event.certificate = certificate
-        event.certificate_signing_request = csr
+        event = SimpleNamespace(certificate=certificate, certificate_signing_request=csr)
         self.harness.set_can_connect(container="nrf", val=True)
 
         self.harness.charm._on_certificate_available(event=event)
 
-        patch_push.assert_called_with(path="/support/TLS/nrf.pem", source=certificate)
+        self.patch_push.assert_called_with(path="/support/TLS/nrf.pem", source=certificate)
 
-    @patch("ops.model.Container.pull")
-    @patch("ops.model.Container.exists")
-    @patch("ops.model.Container.push")
     def test_given_csr_doesnt_match_stored_one_when_certificate_available_then_certificate_is_not_pushed(  # noqa: E501
         self,
-        patch_push,
-        patch_exists,
-        patch_pull,
     ):
-        patch_pull.return_value = StringIO("Stored CSR content")
-        patch_exists.return_value = True
+        self.patch_pull.return_value = StringIO("Stored CSR content")
+        self.patch_exists.return_value = True
         certificate = "Whatever certificate content"
-        event = Mock()
-        event.certificate = certificate
-        event.certificate_signing_request = "Relation CSR content (different from stored one)"
+        event = SimpleNamespace(
+            certificate=certificate,
+            certificate_signing_request="Relation CSR content (different from stored one)",
+        )
         self.harness.set_can_connect(container="nrf", val=True)
 
         self.harness.charm._on_certificate_available(event=event)
 
-        patch_push.assert_not_called()
+        self.patch_push.assert_not_called()
 
-    @patch(
-        "charms.tls_certificates_interface.v2.tls_certificates.TLSCertificatesRequiresV2.request_certificate_creation",  # noqa: E501
-    )
-    @patch("ops.model.Container.push", new=Mock)
-    @patch("charm.generate_csr")
-    @patch("ops.model.Container.pull")
+    @patch.object(TLSCertificatesRequiresV2, "request_certificate_creation")
+    @patch.object(charm, "generate_csr")
     def test_given_certificate_does_not_match_stored_one_when_certificate_expiring_then_certificate_is_not_requested(  # noqa: E501
-        self, patch_pull, patch_generate_csr, patch_request_certificate_creation
+        self, patch_generate_csr, patch_request_certificate_creation
     ):
-        event = Mock()
-        patch_pull.return_value = StringIO("Stored certificate content")
-        event.certificate = "Relation certificate content (different from stored)"
+        self.patch_pull.return_value = StringIO("Stored certificate content")
+        event = SimpleNamespace(certificate="Relation certificate content (different from stored)")
         csr = b"whatever csr content"
         patch_generate_csr.return_value = csr
         self.harness.set_can_connect(container="nrf", val=True)
@@ -483,19 +518,14 @@ class TestCharm(unittest.TestCase):
 
         patch_request_certificate_creation.assert_not_called()
 
-    @patch(
-        "charms.tls_certificates_interface.v2.tls_certificates.TLSCertificatesRequiresV2.request_certificate_creation",  # noqa: E501
-    )
-    @patch("ops.model.Container.push", new=Mock)
-    @patch("charm.generate_csr")
-    @patch("ops.model.Container.pull")
+    @patch.object(TLSCertificatesRequiresV2, "request_certificate_creation")
+    @patch.object(charm, "generate_csr")
     def test_given_certificate_matches_stored_one_when_certificate_expiring_then_certificate_is_requested(  # noqa: E501
-        self, patch_pull, patch_generate_csr, patch_request_certificate_creation
+        self, patch_generate_csr, patch_request_certificate_creation
     ):
         certificate = "whatever certificate content"
-        event = Mock()
-        event.certificate = certificate
-        patch_pull.return_value = StringIO(certificate)
+        event = SimpleNamespace(certificate=certificate)
+        self.patch_pull.return_value = StringIO(certificate)
         csr = b"whatever csr content"
         patch_generate_csr.return_value = csr
         self.harness.set_can_connect(container="nrf", val=True)